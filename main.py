@@ -8,7 +8,14 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
-from src.settings import MEDIA_DIR, MEDIA_PATH
+from src.settings import (
+    MEDIA_DIR,
+    MEDIA_PATH,
+    MEDIA_SNAPSHOT_FILE,
+    device_queue_manager,
+    media_handler,
+    preload_templates,
+)
 from src.utils.converter_watchdog import ConversionWatchdog
 from src.utils.watchdg import observer_thread, observer
 
@@ -18,8 +25,18 @@ logging.basicConfig(
 )
 
 
+def load_media_library() -> None:
+    # Known files come from the snapshot, so only new videos need a duration probe.
+    media_handler.load(MEDIA_SNAPSHOT_FILE)
+    media_handler.sync_files()
+    media_handler.dump(MEDIA_SNAPSHOT_FILE)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await asyncio.to_thread(load_media_library)
+    logging.info("Media library loaded: %s files.", len(media_handler))
+    await asyncio.to_thread(preload_templates)
     # Startup: запускаем наблюдатель в отдельном потоке
     observer_thread.start()
     logging.info("Media observer started.")
@@ -36,6 +53,8 @@ async def lifespan(app: FastAPI):
     observer.join()
     logging.info("Media observer stopped.")
     conversion_watchdog.stop()
+    device_queue_manager.flush_devices_info()
+    media_handler.dump(MEDIA_SNAPSHOT_FILE)
 
 
 app = FastAPI(lifespan=lifespan)
@@ -1,4 +1,5 @@
 from main import app
+from src.settings import HTTP_KEEP_ALIVE_SECONDS
 
 if __name__ == "__main__":
     import uvicorn
@@ -7,5 +8,6 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8000,
-        reload=False
+        reload=False,
+        timeout_keep_alive=HTTP_KEEP_ALIVE_SECONDS,
     )
@@ -1,6 +1,7 @@
 import pickle
 from dataclasses import dataclass, fields
 from pathlib import Path
+from threading import Lock, Timer
 from typing import Tuple, Union, Optional
 
 from src.media import MediaDict, MediaFile
@@ -15,6 +16,10 @@ SETTINGS_LIST = {
     'show_names': 'Show file names'
 }
 
+DEVICES_SAVE_DELAY_SECONDS = 0.2
+# DeviceInfo fields that make up the name shown on the admin dashboard.
+DEVICE_NAME_FIELDS = frozenset({"name", "user_agent", "ip_address"})
+
 
 @dataclass
 class DeviceInfo:
@@ -46,6 +51,14 @@ class DeviceQueueManager:
         self.device_queues = {}
         self.devices_info_file = self.storage_dir / "devices.pkl"
         self.devices_info = self._load_devices_info()
+        self._save_lock = Lock()
+        # Media refreshes come from request handlers, the watchdog and the converter thread.
+        self._media_lock = Lock()
+        self._save_timer: Optional[Timer] = None
+        # Bumped when devices are added, removed or renamed.
+        self._devices_version = 0
+        self._dashboard_static_ctx = None
+        self._dashboard_ctx_version = None
 
     def _load_devices_info(self):
         if self.devices_info_file.exists():
@@ -68,11 +81,25 @@ class DeviceQueueManager:
         return {}
 
     def _save_devices_info(self):
-        try:
-            with self.devices_info_file.open("wb") as f:
-                pickle.dump(self.devices_info, f)
-        except Exception as e:
-            print(f"Error saving device info: {e}")
+        """Schedule a write of device info; bursts of updates are coalesced into one dump."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = Timer(DEVICES_SAVE_DELAY_SECONDS, self.flush_devices_info)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush_devices_info(self):
+        """Write device info to disk immediately."""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            try:
+                with self.devices_info_file.open("wb") as f:
+                    pickle.dump(dict(self.devices_info), f)
+            except Exception as e:
+                print(f"Error saving device info: {e}")
 
     def delete_queue(self, device_id: str):
         dq, _ = self.get_device_data(device_id)
@@ -83,6 +110,7 @@ class DeviceQueueManager:
         self.delete_queue(device_id)
         if device_id in self.devices_info:
             del self.devices_info[device_id]
+            self._devices_version += 1
             self._save_devices_info()
 
     def __getitem__(self, device_id: str):
@@ -106,15 +134,45 @@ class DeviceQueueManager:
             logger.warning(f"No media found for device and settings {device_id}.")
         return media
 
+    def dashboard_static_ctx(self) -> dict:
+        """
+        Return the slow-changing part of the admin dashboard context.
+        Rebuilt only when devices are added, removed or renamed, or the media library changes.
+        """
+        version = (self.media_dict.version, self._devices_version)
+        if self._dashboard_static_ctx is None or self._dashboard_ctx_version != version:
+            media_total, media_photos, media_videos = self.media_dict.counters
+            self._dashboard_static_ctx = {
+                "devices": self.devices_info,
+                "media_total": media_total,
+                "media_photos": media_photos,
+                "media_videos": media_videos,
+                "device_queue_manager": self,
+            }
+            self._dashboard_ctx_version = version
+        return dict(self._dashboard_static_ctx)
+
     def update_query(self, keys: list):
         for dq in self.device_queues.values():
             dq.update_queue(keys)
 
+    def refresh_media(self) -> list:
+        """
+        Rescan the media directory and add new files to every device queue.
+        Returns a list of new keys.
+        """
+        with self._media_lock:
+            new_keys = self.media_dict.sync_files()
+            if new_keys:
+                self.update_query(new_keys)
+        return new_keys
+
     def get_device_info(self, device_id: str) -> DeviceInfo:
         info = self.devices_info.get(device_id)
         if info is None:
             info = DeviceInfo()
             self.devices_info[device_id] = info
+            self._devices_version += 1
             self._save_devices_info()
         return info
 
@@ -123,19 +181,22 @@ class DeviceQueueManager:
             device_info = self.devices_info[device_id]
         else:
             device_info = DeviceInfo()
+            self._devices_version += 1
 
-        update_fields = {}
-        if info is not None:
-            if isinstance(info, dict):
-                update_fields.update(info)
-            elif isinstance(info, DeviceInfo):
-                update_fields.update(info.__dict__)
-            else:
-                raise ValueError("info must be a dict or a DeviceInfo instance")
-        update_fields.update(kwargs)
+        if info is None:
+            update_fields = kwargs
+        elif isinstance(info, dict):
+            update_fields = {**info, **kwargs} if kwargs else info
+        elif isinstance(info, DeviceInfo):
+            update_fields = {**info.__dict__, **kwargs}
+        else:
+            raise ValueError("info must be a dict or a DeviceInfo instance")
 
+        valid_fields = device_info.__dataclass_fields__
         for field, value in update_fields.items():
-            if field in device_info.__dataclass_fields__:
+            if field in valid_fields:
+                if field in DEVICE_NAME_FIELDS and getattr(device_info, field) != value:
+                    self._devices_version += 1
                 setattr(device_info, field, value)
 
         self.devices_info[device_id] = device_info
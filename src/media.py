@@ -1,7 +1,9 @@
 import hashlib
 import logging
 import mimetypes
+import pickle
 import random
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from urllib.parse import quote
@@ -10,6 +12,8 @@ from pymediainfo import MediaInfo
 
 logger = logging.getLogger(__name__)
 
+DURATION_PROBE_WORKERS = 4
+
 
 @dataclass
 class MediaFile:
@@ -34,27 +38,33 @@ def get_video_duration(file_path: Path) -> int:
 class MediaDict(dict):
     photo_keys = None
     video_keys = None
+    counters = (0, 0, 0)
+    version = 0
 
     def __init__(self, media_dir: Path,
                  background_suffix: str = None,
                  uploaded_media_raw: Path = None,
-                 *args, **kwargs):
+                 *args, scan: bool = True, **kwargs):
         """
         Initialize the MediaDict.
         :param media_dir: Directory containing media files.
+        :param scan: Scan the directory right away; pass False to call sync_files later.
         """
         super().__init__(*args, **kwargs)
         self.media_dir = media_dir
         self.background_suffix = background_suffix
         self.uploaded_media_raw = uploaded_media_raw
-        self.sync_files()
+        self.background_urls = {}
+        if scan:
+            self.sync_files()
 
     def sync_files(self):
         """
         Synchronize media files from the directory.
         Returns a list of new keys.
         """
-        new_keys = []
+        new_media = []
+        new_videos = []
         found_keys = set()
 
         for file in self.media_dir.rglob("*"):
@@ -72,21 +82,68 @@ class MediaDict(dict):
             found_keys.add(key)
             if key not in self:
                 if mime_type.startswith("image/"):
-                    self[key] = MediaFile(relative_path=url, file=rel_path)
+                    media = MediaFile(relative_path=url, file=rel_path)
                 else:
-                    duration = get_video_duration(file)
-                    self[key] = MediaFile(relative_path=url, file=rel_path, is_video=True, duration=duration)
-                new_keys.append(key)
-
+                    media = MediaFile(relative_path=url, file=rel_path, is_video=True, duration=0)
+                    new_videos.append((media, file))
+                new_media.append((key, media))
+
+        if new_videos:
+            # MediaInfo parsing runs in native code, so durations are probed in parallel.
+            workers = min(DURATION_PROBE_WORKERS, len(new_videos))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                durations = executor.map(get_video_duration, [file for _, file in new_videos])
+                for (media, _), duration in zip(new_videos, durations):
+                    media.duration = duration
+        # Added only once probed, so requests served meanwhile never see a zero duration.
+        self.update(new_media)
+        new_keys = [key for key, _ in new_media]
+
+        removed = 0
         for key in list(self.keys()):
             if key not in found_keys:
+                media = super().__getitem__(key)
+                self.background_urls.pop(media.file, None)
                 del self[key]
-
-        self.photo_keys = tuple(key for key, media in self.items() if not media.is_video)
-        self.video_keys = tuple(key for key, media in self.items() if media.is_video)
+                removed += 1
+
+        if new_keys or removed:
+            self.version += 1
+
+        photo_keys = []
+        video_keys = []
+        for key, media in self.items():
+            (video_keys if media.is_video else photo_keys).append(key)
+        self.photo_keys = tuple(photo_keys)
+        self.video_keys = tuple(video_keys)
+        self.counters = (len(self), len(self.photo_keys), len(self.video_keys))
         logger.debug(f"New files {len(new_keys)} total {len(self)}")
         return new_keys
 
+    def dump(self, path: Path):
+        """Save the known media entries (including probed durations) to a snapshot file."""
+        try:
+            with path.open("wb") as f:
+                pickle.dump(dict(self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error("Error saving media snapshot %s: %s", path, e)
+
+    def load(self, path: Path):
+        """
+        Preload entries from a snapshot written by dump().
+        Call sync_files afterwards: it drops missing files and only probes new ones.
+        """
+        if not path.exists():
+            return
+        try:
+            with path.open("rb") as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            logger.error("Error loading media snapshot %s: %s", path, e)
+            return
+        if isinstance(snapshot, dict):
+            self.update((k, v) for k, v in snapshot.items() if isinstance(v, MediaFile))
+
     def __getitem__(self, key):
         item = super().__getitem__(key)
         if item is None or not item.relative_path:
@@ -7,6 +7,9 @@ from src.media import MediaDict
 
 logger = logging.getLogger(__name__)
 
+SHUFFLE_BATCH_SIZE = 512
+QUEUE_FILE_HEADER = b"v1\n"
+
 
 class DeviceQueue:
     def __init__(self, device_id: str, media_dict: MediaDict, storage_dir: Path, shuffle: bool = True):
@@ -19,41 +22,58 @@ class DeviceQueue:
         """
         self.device_id = device_id
         self.media_dict = media_dict
-        self.storage_file = storage_dir / f"queue_{device_id}.pkl"
+        self._keys_fn = media_dict.keys
+        self.storage_file = storage_dir / f"queue_{device_id}.txt"
+        # Pickled queue written by older versions; read once and then removed.
+        self.legacy_storage_file = storage_dir / f"queue_{device_id}.pkl"
         self.shuffle = shuffle
         self.queue = []
+        self._shuffled_tail = 0
         self.load_queue()
         # Only update the queue if it is empty.
         if not self.queue:
             self.update_queue()
 
     def load_queue(self):
-        """Load queue from file or initialize empty queue."""
-        if self.storage_file.exists():
+        """Load queue from file, falling back to the legacy pickle, or initialize empty queue."""
+        source = self.storage_file if self.storage_file.exists() else self.legacy_storage_file
+        if source.exists():
             try:
-                with self.storage_file.open("rb") as f:
-                    self.queue = pickle.load(f)
+                data = source.read_bytes()
+                if source is self.legacy_storage_file:
+                    # Rewritten in the text format below.
+                    self.queue = pickle.loads(data)
+                elif data.startswith(QUEUE_FILE_HEADER):
+                    body = data[len(QUEUE_FILE_HEADER):].decode("utf-8")
+                    self.queue = body.split("\n") if body else []
+                else:
+                    raise ValueError("unknown queue file format")
             except Exception as e:
                 logger.error(f"Error loading queue for {self.device_id}: {e}")
                 self.queue = []
         else:
             self.queue = []
         self.save_queue()
+        if source is self.legacy_storage_file and self.storage_file.exists():
+            try:
+                self.legacy_storage_file.unlink(missing_ok=True)
+            except Exception as e:
+                logger.error(f"Error removing legacy queue file for {self.device_id}: {e}")
 
     def save_queue(self):
         """Save the current queue to file."""
         try:
-            with self.storage_file.open("wb") as f:
-                pickle.dump(self.queue, f)
+            self.storage_file.write_bytes(QUEUE_FILE_HEADER + "\n".join(self.queue).encode("utf-8"))
         except Exception as e:
             logger.error(f"Error saving queue for {self.device_id}: {e}")
 
     def delete_dump(self):
         """Delete queue file (if exists) and clear in-memory queue."""
         try:
-            if self.storage_file.exists():
-                self.storage_file.unlink()
-                logger.debug(f"Queue file {self.storage_file} deleted for device {self.device_id}.")
+            for path in (self.storage_file, self.legacy_storage_file):
+                if path.exists():
+                    path.unlink()
+                    logger.debug(f"Queue file {path} deleted for device {self.device_id}.")
         except Exception as e:
             logger.error(f"Error deleting queue file for device {self.device_id}: {e}")
         self.queue = []
@@ -66,16 +86,30 @@ class DeviceQueue:
         and shuffle if enabled.
         """
         if keys is None:
-            keys = list(self.media_dict.keys())
+            keys = list(self._keys_fn())
         keys.reverse()
         # Merge new keys with existing ones, avoiding duplicates.
-        combined = keys + [key for key in self.queue if key not in keys]
+        new_keys = set(keys)
+        combined = keys + [key for key in self.queue if key not in new_keys]
         self.queue = combined
         if self.shuffle:
-            random.shuffle(self.queue)
+            self._shuffle_tail()
         self.save_queue()
         logger.debug(f"Queue updated for device {self.device_id}: {len(self.queue)} items.")
 
+    def _shuffle_tail(self):
+        """
+        Shuffle only the next SHUFFLE_BATCH_SIZE items to be popped (partial Fisher-Yates).
+        Each batch is a uniform sample of what is left, so the overall order stays uniform.
+        """
+        queue = self.queue
+        n = len(queue)
+        stop = max(n - SHUFFLE_BATCH_SIZE, 0)
+        for i in range(n - 1, stop - 1, -1):
+            j = random.randrange(i + 1)
+            queue[i], queue[j] = queue[j], queue[i]
+        self._shuffled_tail = n - stop
+
     def get_next_counters(self, only_photo=False):
         return self.get_next(only_photo=only_photo), len(self.media_dict) - len(self.queue), len(self.media_dict)
 
@@ -93,6 +127,9 @@ class DeviceQueue:
             if only_photo and len(self.media_dict.photo_keys) == 0:
                 return None
             key = self.queue.pop()
+            self._shuffled_tail -= 1
+            if self.shuffle and self._shuffled_tail <= 0 and self.queue:
+                self._shuffle_tail()
             media = self.media_dict.get(key)
             if media is None or only_photo and media.is_video:
                 continue
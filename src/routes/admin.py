@@ -1,10 +1,16 @@
+import asyncio
+import io
+import os
 import shutil
+from pathlib import Path
+from typing import BinaryIO, Optional
+
 from fastapi import APIRouter, Request, Form, UploadFile, File
 from fastapi.responses import JSONResponse
 from starlette.responses import RedirectResponse, HTMLResponse
 
 from src.device_manager import SETTINGS_LIST
-from src.settings import device_queue_manager, templates, UPLOADED_RAW_DIR, UPLOADED_DIR
+from src.settings import device_queue_manager, templates, UPLOADED_RAW_DIR, UPLOADED_DIR, VIDEO_BACKGROUND_SUFFIX
 from src.utils.converter_control import (
     get_conversion_status,
     is_conversion_running,
@@ -16,40 +22,72 @@ from src.utils.files import count_files_recursive
 router = APIRouter(prefix="/admin", tags=["admin"])
 
 SETTINGS_CHECKS = {**SETTINGS_LIST, "video_background": "Video Background"}
+UPLOAD_CHUNK_SIZE = 1 << 20
+# Starlette keeps multipart uploads of up to 1 MiB in memory
+# (MultiPartParser.spool_max_size) and rolls larger ones over to a temporary file.
+UPLOAD_SPOOL_MAX_SIZE = 1 << 20
+
+
+def _disk_fileno(source: BinaryIO, size: int) -> Optional[int]:
+    # fileno() on an in-memory SpooledTemporaryFile would write it to disk first.
+    if size <= UPLOAD_SPOOL_MAX_SIZE:
+        return None
+    try:
+        return source.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _sendfile(source: BinaryIO, buffer: BinaryIO, size: int) -> bool:
+    src_fd = _disk_fileno(source, size)
+    if src_fd is None or not hasattr(os, "sendfile"):
+        return False
+    offset = 0
+    try:
+        while offset < size:
+            sent = os.sendfile(buffer.fileno(), src_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+    except OSError:
+        buffer.seek(0)
+        buffer.truncate()
+        return False
+    return offset == size
+
+
+def _write_upload(destination: Path, source: BinaryIO, size: Optional[int]) -> None:
+    with open(destination, "wb") as buffer:
+        if size and _sendfile(source, buffer, size):
+            return
+        buffer.seek(0)
+        buffer.truncate()
+        source.seek(0)
+        shutil.copyfileobj(source, buffer, length=UPLOAD_CHUNK_SIZE)
 
 
 @router.get("", response_class=HTMLResponse)
 async def admin_dashboard(request: Request):
-    devices = device_queue_manager.devices_info
-    md = device_queue_manager.media_dict
-    media_total = len(md)
-    media_photos = len(md.photo_keys) if md.photo_keys else 0
-    media_videos = len(md.video_keys) if md.video_keys else 0
-
     update_msg = request.session.pop("update_msg", None)
     conversion_state = get_conversion_status()
-    response = templates.TemplateResponse("admin.jinja2", {
+    context = device_queue_manager.dashboard_static_ctx()
+    context.update({
         "request": request,
-        "devices": devices,
-        "media_total": media_total,
-        "media_photos": media_photos,
-        "media_videos": media_videos,
         "update_msg": update_msg,
-        "device_queue_manager": device_queue_manager,
         "settings_checks": SETTINGS_CHECKS,
-        "upload_raw": count_files_recursive(UPLOADED_RAW_DIR),
-        "uploaded": count_files_recursive(UPLOADED_DIR),
+        "upload_raw": count_files_recursive(UPLOADED_RAW_DIR, VIDEO_BACKGROUND_SUFFIX),
+        "uploaded": count_files_recursive(UPLOADED_DIR, VIDEO_BACKGROUND_SUFFIX),
         "conversion_state": conversion_state,
         "conversion_active": is_conversion_running() or conversion_state.get("status") in {"running", "scheduled", "restarting"},
     })
+    response = templates.TemplateResponse("admin.jinja2", context)
     return response
 
 
 @router.post("/update_content")
 async def update_content(request: Request):
-    new_keys = device_queue_manager.media_dict.sync_files()
+    new_keys = await asyncio.to_thread(device_queue_manager.refresh_media)
     if new_keys:
-        device_queue_manager.update_query(new_keys)
         update_status = f"New media added: {len(new_keys)}"
     else:
         update_status = "No new media found."
@@ -84,10 +122,10 @@ async def admin_device_settings(request: Request, device_id: str):
 @router.post("/upload")
 async def upload_files(request: Request, files: list[UploadFile] = File(...)):
     try:
-        for file in files:
-            destination = UPLOADED_RAW_DIR / file.filename
-            with open(destination, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+        await asyncio.gather(*(
+            asyncio.to_thread(_write_upload, UPLOADED_RAW_DIR / file.filename, file.file, file.size)
+            for file in files
+        ))
         port = str(request.url.port or "8000")
         conversion_message = start_conversion(port)
         message = f"Files uploaded. {conversion_message}"
@@ -133,15 +171,14 @@ async def update_admin_device_settings(
         name: str = Form("")
 ):
     photo_time = max(photo_time, 5)
-    device_queue_manager.update_device_info(
-        device_id,
-        photo_time=photo_time,
-        only_photo=only_photo,
-        modern_mode=modern_mode,
-        sequential_mode=sequential_mode,
-        show_counters=show_counters,
-        video_background=video_background == "video",
-        show_names=show_names,
-        name=name
-    )
+    device_queue_manager.update_device_info(device_id, {
+        "photo_time": photo_time,
+        "only_photo": only_photo,
+        "modern_mode": modern_mode,
+        "sequential_mode": sequential_mode,
+        "show_counters": show_counters,
+        "video_background": video_background == "video",
+        "show_names": show_names,
+        "name": name,
+    })
     return RedirectResponse(url="/admin", status_code=303)
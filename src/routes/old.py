@@ -9,6 +9,9 @@ from src.utils.gradient import get_random_svg_gradient
 from src.utils.video_background import get_static_background_path
 
 router = APIRouter()
+# The playback page is the hottest route; render the preloaded template directly
+# instead of resolving it by name through TemplateResponse on every hit.
+INDEX_TEMPLATE = templates.get_template("index.jinja2")
 
 
 @router.get("/", response_class=HTMLResponse)
@@ -44,10 +47,8 @@ async def get_media_page(request: Request, device_id: str = Cookie(None)):
         include_inline_video = is_outdated_ios(request.headers.get("user-agent", ""))
         file_name = media.file
 
-    response = templates.TemplateResponse(
-        "index.jinja2",
+    response = HTMLResponse(INDEX_TEMPLATE.render(
         {
-            "request": request,
             "file_url": content,
             "refresh_time": refresh_time,
             "is_video": is_video,
@@ -57,7 +58,7 @@ async def get_media_page(request: Request, device_id: str = Cookie(None)):
             "counters_text": counters_text,
             "file_name": file_name if device_info.show_names else None,
         },
-    )
+    ))
     response.set_cookie(key="device_id", value=device_id, max_age=31536000, path="/", httponly=True)
     return response
 
@@ -9,7 +9,7 @@ router = APIRouter(prefix="/go", tags=["settings"])
 
 
 @router.get("")
-async def device_settings(request: Request, device_id: str = Cookie(None)):
+def device_settings(request: Request, device_id: str = Cookie(None)):
     device_id = get_device_id(request, device_id)
     device_info = device_queue_manager.get_device_info(device_id) or {}
     return templates.TemplateResponse("settings.jinja2", {
@@ -22,7 +22,7 @@ async def device_settings(request: Request, device_id: str = Cookie(None)):
 
 
 @router.post("")
-async def update_device_settings(
+def update_device_settings(
         request: Request,
         photo_time: int = Form(15),
         only_photo: bool = Form(False),
@@ -38,18 +38,16 @@ async def update_device_settings(
     photo_time = max(photo_time, 5)
     user_agent = request.headers.get("user-agent", "unknown")
     client_ip = getattr(request.client, "host", "unknown")
-    device_queue_manager.update_device_info(
-        device_id,
-        photo_time=photo_time,
-        only_photo=only_photo,
-        modern_mode=modern_mode,
-        sequential_mode=sequential_mode,
-        show_counters=show_counters,
-        video_background=video_background == "video",
-        user_agent=user_agent,
-        show_names=show_names,
-        ip_address=client_ip,
-        name=name
-
-    )
+    device_queue_manager.update_device_info(device_id, {
+        "photo_time": photo_time,
+        "only_photo": only_photo,
+        "modern_mode": modern_mode,
+        "sequential_mode": sequential_mode,
+        "show_counters": show_counters,
+        "video_background": video_background == "video",
+        "user_agent": user_agent,
+        "show_names": show_names,
+        "ip_address": client_ip,
+        "name": name,
+    })
     return RedirectResponse(url="/", status_code=303)
@@ -4,6 +4,7 @@ from typing import Optional
 
 from dotenv import load_dotenv
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 
 from src.device_manager import DeviceQueueManager
 from src.media import MediaDict
@@ -11,6 +12,7 @@ from src.media import MediaDict
 load_dotenv()
 
 MEDIA_PATH = '/media'
+HTTP_KEEP_ALIVE_SECONDS = int(os.getenv("HTTP_KEEP_ALIVE_SECONDS", "120"))
 VIDEO_BACKGROUND_SUFFIX = ".background.jpg"
 MEDIA_DIR = Path(os.getenv("MEDIA_DIR", "gallery"))
 
@@ -22,6 +24,8 @@ UPLOADED_DIR.mkdir(parents=True, exist_ok=True)
 STORAGE_DIR = Path(__file__).resolve().parent.parent / "storage"
 STORAGE_DIR.mkdir(exist_ok=True)
 CONVERT_LOCK_FILE = STORAGE_DIR / "converter.lock"
+MEDIA_SNAPSHOT_FILE = STORAGE_DIR / "media.pkl"
+PROBE_CACHE_FILE = STORAGE_DIR / "probe_cache.json"
 CONVERTER_THROTTLE_SECONDS = int(os.getenv("CONVERTER_THROTTLE_SECONDS", "30"))
 CONVERTER_STARTUP_DELAY_SECONDS = int(
     os.getenv("CONVERTER_STARTUP_DELAY_SECONDS", "10")
@@ -32,6 +36,7 @@ CONVERTER_MAX_VIDEO_LONG_EDGE = int(os.getenv("CONVERTER_MAX_VIDEO_LONG_EDGE", "
 CONVERTER_MAX_VIDEO_SHORT_EDGE = int(os.getenv("CONVERTER_MAX_VIDEO_SHORT_EDGE", "0"))
 CONVERTER_VIDEO_PRESET = os.getenv("CONVERTER_VIDEO_PRESET", "medium")
 CONVERTER_HIGH_RES_PRESET = os.getenv("CONVERTER_HIGH_RES_PRESET", "veryfast")
+CONVERTER_HWACCEL = os.getenv("CONVERTER_HWACCEL", "").strip().lower()
 
 
 def _positive_int_env(name: str) -> Optional[int]:
@@ -46,6 +51,7 @@ def _positive_int_env(name: str) -> Optional[int]:
 
 
 CONVERTER_FFMPEG_THREADS = _positive_int_env("CONVERTER_FFMPEG_THREADS")
+CONVERTER_IMAGE_WORKERS = _positive_int_env("CONVERTER_IMAGE_WORKERS")
 
 _syncthing_auto_pause = os.getenv("SYNCTHING_AUTO_PAUSE", "false").strip().lower()
 SYNCTHING_AUTO_PAUSE = _syncthing_auto_pause in {"1", "true", "yes", "on"}
@@ -53,8 +59,24 @@ SYNCTHING_API_URL = os.getenv("SYNCTHING_API_URL", "http://localhost:8384")
 SYNCTHING_API_KEY = os.getenv("SYNCTHING_API_KEY")
 SYNCTHING_FOLDER_ID = os.getenv("SYNCTHING_FOLDER_ID")
 
-media_handler = MediaDict(MEDIA_DIR, VIDEO_BACKGROUND_SUFFIX, UPLOADED_RAW_DIR)
+# The gallery is scanned in the app lifespan, so importing settings stays cheap
+# (the converter and other helpers import this module too).
+media_handler = MediaDict(MEDIA_DIR, VIDEO_BACKGROUND_SUFFIX, UPLOADED_RAW_DIR, scan=False)
 device_queue_manager = DeviceQueueManager(media_handler, STORAGE_DIR)
 
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
+templates.env.auto_reload = False
+JINJA_CACHE_DIR = STORAGE_DIR / "jinja_cache"
+PRELOADED_TEMPLATES = ("index.jinja2", "settings.jinja2", "admin.jinja2")
+
+
+def preload_templates() -> None:
+    """Enable the Jinja bytecode cache and compile the page templates.
+
+    Called from the app lifespan rather than at import, like the gallery scan.
+    """
+    JINJA_CACHE_DIR.mkdir(exist_ok=True)
+    templates.env.bytecode_cache = FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+    for name in PRELOADED_TEMPLATES:
+        templates.env.get_template(name)
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from copy import deepcopy
-from datetime import datetime
+import time
 from threading import Lock
 from typing import Any, Dict
 
 __all__ = ["get_state", "update_state", "reset_state"]
 
-_STATE_LOCK = Lock()
+# Writers serialize on the lock and publish a fresh dict by rebinding _STATE;
+# readers take the current reference without locking and never mutate it.
+_WRITE_LOCK = Lock()
 _DEFAULT_STATE: Dict[str, Any] = {
     "status": "idle",
     "total": 0,
@@ -15,35 +16,47 @@ _DEFAULT_STATE: Dict[str, Any] = {
     "remaining": 0,
     "percent": 0.0,
     "current": None,
-    "errors": [],
+    "errors": (),
     "last_update": None,
 }
-_STATE: Dict[str, Any] = deepcopy(_DEFAULT_STATE)
+_STATE: Dict[str, Any] = dict(_DEFAULT_STATE)
+_LAST_TIMESTAMP: tuple[int, str] = (0, "")
 
 
 def _timestamp() -> str:
-    return datetime.now().astimezone().strftime("%Y-%m-%d %H:%M:%S")
+    # Progress updates arrive several times per second; format each second once.
+    global _LAST_TIMESTAMP
+    seconds = int(time.time())
+    if seconds != _LAST_TIMESTAMP[0]:
+        _LAST_TIMESTAMP = (seconds, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds)))
+    return _LAST_TIMESTAMP[1]
 
 
 def get_state() -> Dict[str, Any]:
-    with _STATE_LOCK:
-        return deepcopy(_STATE)
+    return dict(_STATE)
 
 
 def update_state(state: Dict[str, Any]) -> None:
+    global _STATE
     stamped_state: Dict[str, Any] = {**_DEFAULT_STATE, **state}
     errors = stamped_state.get("errors")
-    if isinstance(errors, list):
-        stamped_state["errors"] = deepcopy(errors[-10:])
+    if isinstance(errors, (list, tuple)):
+        # Stored as a tuple of private copies so readers can share it without copying.
+        stamped_state["errors"] = tuple(
+            dict(error) if isinstance(error, dict) else error for error in errors[-10:]
+        )
     else:
-        stamped_state["errors"] = []
+        stamped_state["errors"] = ()
+    current = stamped_state.get("current")
+    if isinstance(current, dict):
+        stamped_state["current"] = dict(current)
     stamped_state["last_update"] = _timestamp()
 
-    with _STATE_LOCK:
-        _STATE.update(deepcopy(stamped_state))
+    with _WRITE_LOCK:
+        _STATE = {**_STATE, **stamped_state}
 
 
 def reset_state() -> None:
-    with _STATE_LOCK:
-        _STATE.clear()
-        _STATE.update(deepcopy(_DEFAULT_STATE))
+    global _STATE
+    with _WRITE_LOCK:
+        _STATE = dict(_DEFAULT_STATE)
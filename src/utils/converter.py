@@ -1,32 +1,45 @@
 import json
 import logging
+import multiprocessing
 import os
 import re
 import signal
 import subprocess
 import sys
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from contextlib import nullcontext
-from copy import deepcopy
-from datetime import datetime
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from threading import Event
-from typing import Dict, List, Optional
+from queue import Empty, SimpleQueue
+from threading import Event, Lock, Thread
+from typing import Callable, Deque, Dict, List, Optional
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 import httpx
-from PIL import Image, ImageOps
 from pymediainfo import MediaInfo
 
 from src.settings import (
     CONVERT_LOCK_FILE,
+    PROBE_CACHE_FILE,
     CONVERTER_HIGH_RES_PRESET,
+    CONVERTER_HWACCEL,
     CONVERTER_MAX_VIDEO_HEIGHT,
     CONVERTER_MAX_VIDEO_LONG_EDGE,
     CONVERTER_MAX_VIDEO_SHORT_EDGE,
     CONVERTER_MAX_VIDEO_WIDTH,
     CONVERTER_VIDEO_PRESET,
     CONVERTER_FFMPEG_THREADS,
+    CONVERTER_IMAGE_WORKERS,
     SYNCTHING_API_KEY,
     SYNCTHING_API_URL,
     SYNCTHING_AUTO_PAUSE,
@@ -35,17 +48,13 @@ from src.settings import (
     UPLOADED_RAW_DIR,
 )
 from src.utils.conversion_state import update_state
+from src.utils.converter_images import convert_image_file, init_image_worker
+from src.utils.converter_names import get_new_filename, local_now, part_file_path
 from src.utils.converter_queue import ConversionQueue, QueueItem
-from src.utils.files import get_capture_date, get_video_capture_date
+from src.utils.converter_types import StopRequested
+from src.utils.files import get_video_capture_date
 from src.utils.syncthing import SyncthingPauseManager
 
-try:  # pragma: no cover - optional dependency
-    from pillow_heif import register_heif_opener
-
-    register_heif_opener()
-except Exception:  # pragma: no cover - optional dependency
-    pass
-
 logger = logging.getLogger("media converter")
 
 
@@ -94,75 +103,162 @@ def _install_signal_handlers() -> None:  # pragma: no cover - signal handling
         except (AttributeError, ValueError):
             continue
 
-IMAGE_MAX_WIDTH = 3840
-IMAGE_MAX_HEIGHT = 2160
-IMAGE_QUALITY = 60
+IMAGE_WORKERS = CONVERTER_IMAGE_WORKERS or os.cpu_count() or 1
 
 
-class StopRequested(Exception):
-    """Raised when the worker should abort and exit."""
+# Decode on whatever accelerator ffmpeg finds; it falls back to software decoding
+# by itself, and frames are handed to a CPU encoder in system memory.
+HW_DECODE_ARGS = ("-hwaccel", "auto")
 
 
-def _now() -> datetime:
-    return datetime.now().astimezone()
+@dataclass(frozen=True)
+class HardwareEncoder:
+    """ffmpeg arguments for one H.264 hardware encoder."""
 
+    codec: str
+    # Placed before ``-i`` (hwaccel decode or device setup).
+    input_args: tuple[str, ...]
+    # Replaces ``-c:v libx264 -preset ... -crf 30``; quality tuned to look like CRF 30.
+    output_args: tuple[str, ...]
+    # ``{width}``/``{height}`` filter used when the video has to be downscaled.
+    scale_filter: str
+    # Filter needed even without scaling, e.g. uploading frames to the VAAPI surface.
+    base_filter: Optional[str] = None
 
-def _parse_datetime_from_name(name: str) -> Optional[datetime]:
-    base = Path(name).stem
-    match = re.search(r"(\d{4})[-_]?(\d{2})[-_]?(\d{2})[-_ ]?(\d{2})[-_]?(\d{2})[-_]?(\d{2})", base)
-    if match:
-        parts = [int(value) for value in match.groups()]
-        try:
-            return datetime(*parts)
-        except ValueError:
-            return None
-    match = re.search(r"(\d{4})[-_]?(\d{2})[-_]?(\d{2})", base)
-    if match:
-        y, m, d = [int(value) for value in match.groups()]
+
+# Tried in this order when CONVERTER_HWACCEL=auto.
+HW_ENCODERS: Dict[str, HardwareEncoder] = {
+    "cuda": HardwareEncoder(
+        codec="h264_nvenc",
+        # Decode, scale and encode all stay in GPU memory.
+        input_args=("-hwaccel", "cuda", "-hwaccel_output_format", "cuda"),
+        output_args=(
+            "-c:v",
+            "h264_nvenc",
+            "-preset",
+            "p4",
+            "-tune",
+            "hq",
+            "-rc",
+            "vbr",
+            "-cq",
+            "28",
+            "-b:v",
+            "0",
+            "-maxrate",
+            "20M",
+            "-bufsize",
+            "40M",
+        ),
+        scale_filter="scale_cuda={width}:{height}",
+    ),
+    "qsv": HardwareEncoder(
+        codec="h264_qsv",
+        input_args=("-hwaccel", "qsv", "-hwaccel_output_format", "qsv"),
+        output_args=("-c:v", "h264_qsv", "-preset", "medium", "-global_quality", "28"),
+        scale_filter="scale_qsv=w={width}:h={height}",
+    ),
+    "vaapi": HardwareEncoder(
+        codec="h264_vaapi",
+        input_args=("-vaapi_device", "/dev/dri/renderD128"),
+        output_args=("-c:v", "h264_vaapi", "-qp", "28"),
+        scale_filter="format=nv12,hwupload,scale_vaapi=w={width}:h={height}",
+        base_filter="format=nv12,hwupload",
+    ),
+    "videotoolbox": HardwareEncoder(
+        codec="h264_videotoolbox",
+        input_args=("-hwaccel", "videotoolbox"),
+        output_args=("-c:v", "h264_videotoolbox", "-q:v", "60", "-pix_fmt", "yuv420p"),
+        scale_filter="scale={width}:{height}",
+    ),
+    # Raspberry Pi stateful encoder; it has no constant-quality mode, so use a bitrate cap.
+    "v4l2m2m": HardwareEncoder(
+        codec="h264_v4l2m2m",
+        input_args=HW_DECODE_ARGS,
+        output_args=("-c:v", "h264_v4l2m2m", "-b:v", "6M", "-pix_fmt", "yuv420p"),
+        scale_filter="scale={width}:{height}",
+    ),
+}
+# stderr fragments meaning the hardware encoder cannot be used at all on this host.
+HW_DEVICE_ERRORS = (
+    "No NVENC capable devices found",
+    "Cannot load libcuda",
+    "Cannot load libnvidia-encode",
+    "CUDA_ERROR",
+    "Error creating a MFX session",
+    "Failed to initialise VAAPI",
+    "No VA display found",
+    "Device creation failed",
+    "Could not find a valid device",
+    "cannot create compression session",
+)
+
+
+_FFMPEG_ENCODERS: Optional[frozenset] = None
+
+
+def _ffmpeg_encoders() -> frozenset:
+    """List the encoders of this ffmpeg build once per process."""
+    global _FFMPEG_ENCODERS
+    if _FFMPEG_ENCODERS is None:
         try:
-            return datetime(y, m, d)
-        except ValueError:
-            return None
-    return None
+            result = subprocess.run(
+                ["ffmpeg", "-hide_banner", "-encoders"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                check=True,
+            )
+        except Exception as exc:  # pragma: no cover - depends on ffmpeg availability
+            logger.warning("Unable to list ffmpeg encoders: %s", exc)
+            _FFMPEG_ENCODERS = frozenset()
+        else:
+            _FFMPEG_ENCODERS = frozenset(
+                parts[1] for parts in (line.split() for line in result.stdout.splitlines()) if len(parts) > 1
+            )
+    return _FFMPEG_ENCODERS
 
 
-def _clean_base_name(original_name: str) -> str:
-    base = Path(original_name).stem
-    base = re.sub(r"\(\d+\)$", "", base)
-    base = re.sub(r"^(\d{4}[-_]?\d{2}[-_]?\d{2}([-_ ]?\d{2}[-_]?\d{2}[-_]?\d{2})?)", "", base)
-    base = base.strip()
-    base = re.sub(r"\s+", "-", base)
-    base = re.sub(r"[^\w-]", "-", base, flags=re.UNICODE)
-    base = re.sub(r"-{2,}", "-", base)
-    base = re.sub(r"_{2,}", "_", base)
-    return base.strip("-_")
+def _select_hw_encoder(hwaccel: str) -> Optional[HardwareEncoder]:
+    """Resolve ``CONVERTER_HWACCEL`` to an encoder this ffmpeg build supports."""
+    if not hwaccel:
+        return None
+    if hwaccel == "auto":
+        candidates = list(HW_ENCODERS.values())
+    elif hwaccel in HW_ENCODERS:
+        candidates = [HW_ENCODERS[hwaccel]]
+    else:
+        logger.warning("Unknown CONVERTER_HWACCEL=%s; using libx264", hwaccel)
+        return None
+    encoders = _ffmpeg_encoders()
+    for encoder in candidates:
+        if encoder.codec in encoders:
+            return encoder
+    logger.warning("CONVERTER_HWACCEL=%s but ffmpeg has no matching encoder; using libx264", hwaccel)
+    return None
 
 
-def _is_redundant_time_segment(base: str, time_part: str) -> bool:
-    if not base:
-        return False
-    if any(ch not in "0123456789-_" for ch in base):
-        return False
-    digits = "".join(ch for ch in base if ch.isdigit())
-    return digits == time_part and len(digits) == len(time_part)
-
-
-def get_new_filename(original_name: str, capture_date: Optional[datetime] = None, ext: Optional[str] = None) -> str:
-    capture = capture_date or _parse_datetime_from_name(original_name) or _now()
-    if capture.tzinfo:
-        capture = capture.astimezone().replace(tzinfo=None)
-    suffix = ext if ext is not None else Path(original_name).suffix
-    suffix = suffix.lower() if suffix else ""
-    if suffix and not suffix.startswith("."):
-        suffix = f".{suffix}"
-    base = _clean_base_name(original_name)
-    date_part = capture.strftime("%Y%m%d")
-    time_part = capture.strftime("%H%M%S")
-    if _is_redundant_time_segment(base, time_part):
-        base = ""
-    if base:
-        return f"{date_part}-{time_part}-{base}{suffix}"
-    return f"{date_part}-{time_part}{suffix}"
+PROBE_WORKERS = max(4, (os.cpu_count() or 1) // 2)
+PROBE_TIMEOUT_SECONDS = 10
+STREAM_COPY_SUFFIXES = frozenset({".mp4", ".m4v", ".mov"})
+STREAM_COPY_ARGS = ("-c", "copy")
+AAC_AUDIO_ARGS = ("-c:a", "aac", "-b:a", "128k")
+# Shared by every video command: web-friendly MP4, no metadata, progress on stdout.
+VIDEO_OUTPUT_ARGS = (
+    "-movflags",
+    "faststart",
+    "-map_metadata",
+    "-1",
+    "-progress",
+    "pipe:1",
+    "-nostats",
+    "-loglevel",
+    "error",
+)
+PROGRESS_STEP_PERCENT = 0.5
+PROGRESS_POLL_SECONDS = 0.5
+PROGRESS_READ_SIZE = 8192
+STATE_PUBLISH_INTERVAL = 0.25
 
 
 def _write_error_log(file_path: Path, error_text: str) -> None:
@@ -170,46 +266,87 @@ def _write_error_log(file_path: Path, error_text: str) -> None:
 
 
 def _remove_error_log(file_path: Path) -> None:
-    error_path = file_path.with_suffix(".txt")
-    if error_path.exists():
-        error_path.unlink()
+    file_path.with_suffix(".txt").unlink(missing_ok=True)
 
 
-def _probe_video_duration(input_path: Path) -> Optional[float]:
-    cmd = [
-        "ffprobe",
-        "-v",
-        "error",
-        "-show_entries",
-        "format=duration",
-        "-of",
-        "default=noprint_wrappers=1:nokey=1",
-        str(input_path),
-    ]
+def _last_out_time(block: bytes) -> Optional[int]:
+    """Return the newest ffmpeg ``-progress`` position in microseconds found in ``block``."""
+    # out_time_ms is also in microseconds; it is the only key on ffmpeg older than 4.2.
+    for key in (b"out_time_us=", b"out_time_ms="):
+        start = block.rfind(key)
+        if start < 0:
+            continue
+        end = block.find(b"\n", start)
+        try:
+            return int(block[start + len(key) : end if end >= 0 else None])
+        except ValueError:
+            return None
+    return None
+
+
+def _drain_pipe(pipe, chunks: List[bytes]) -> None:
     try:
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-    except Exception as exc:  # pragma: no cover - depends on ffprobe availability
-        logger.warning("Unable to read duration for %s: %s", input_path.name, exc)
-        return None
+        for chunk in iter(lambda: pipe.read(65536), b""):
+            chunks.append(chunk)
+    finally:
+        pipe.close()
+
+
+def _pump_pipe(pipe, chunks: "SimpleQueue[bytes]") -> None:
+    """Forward reads from ``pipe`` to ``chunks``; an empty chunk marks the end."""
     try:
-        return float(result.stdout.strip())
-    except ValueError:
-        return None
+        for chunk in iter(lambda: pipe.read(PROGRESS_READ_SIZE), b""):
+            chunks.put(chunk)
+    finally:
+        chunks.put(b"")
+        pipe.close()
+
 
+@dataclass(frozen=True)
+class VideoInfo:
+    """What one ffprobe run tells us about a source video."""
 
-def _probe_video_dimensions(input_path: Path) -> Optional[tuple[int, int]]:
+    duration: Optional[float] = None
+    # Display dimensions, i.e. already swapped for 90/270 degree rotation.
+    dimensions: Optional[tuple[int, int]] = None
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    audio_codecs: tuple[str, ...] = ()
+    rotated: bool = False
+
+
+def _stream_rotation(stream: Dict[str, object]) -> int:
+    for side_data in stream.get("side_data_list") or ():
+        if "rotation" in side_data:
+            try:
+                return int(float(side_data["rotation"]))
+            except (TypeError, ValueError):
+                return 0
+    try:
+        return int((stream.get("tags") or {}).get("rotate", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _probe_video_info(input_path: Path) -> VideoInfo:
+    """Read duration, dimensions and codecs with a single ffprobe run."""
     cmd = [
         "ffprobe",
         "-v",
         "error",
-        "-select_streams",
-        "v:0",
         "-show_entries",
-        "stream=width,height",
+        "format=duration:stream=codec_type,codec_name,pix_fmt,width,height"
+        ":stream_tags=rotate:stream_side_data=rotation",
         "-of",
-        "csv=s=,:p=0",
+        "json",
         str(input_path),
     ]
+    duration: Optional[float] = None
+    dimensions: Optional[tuple[int, int]] = None
+    video_codec: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    audio_codecs: List[str] = []
+    rotation = 0
     try:
         result = subprocess.run(
             cmd,
@@ -219,22 +356,119 @@ def _probe_video_dimensions(input_path: Path) -> Optional[tuple[int, int]]:
             check=True,
         )
     except Exception as exc:  # pragma: no cover - depends on ffprobe availability
-        logger.warning("Unable to read dimensions for %s: %s", input_path.name, exc)
+        logger.warning("Unable to probe %s: %s", input_path.name, exc)
     else:
-        line = result.stdout.strip()
-        if line:
-            parts = line.split(",")
-            if len(parts) == 2:
-                try:
-                    width = int(parts[0])
-                    height = int(parts[1])
-                except ValueError:
-                    pass
-                else:
-                    if width > 0 and height > 0:
-                        return width, height
+        try:
+            data = json.loads(result.stdout or "{}")
+        except ValueError:
+            data = {}
+        try:
+            duration = float((data.get("format") or {}).get("duration"))
+        except (TypeError, ValueError):
+            duration = None
+        for stream in data.get("streams") or ():
+            codec_type = stream.get("codec_type")
+            if codec_type == "audio":
+                audio_codecs.append(stream.get("codec_name") or "")
+                continue
+            if codec_type != "video" or video_codec is not None:
+                continue
+            video_codec = stream.get("codec_name")
+            pix_fmt = stream.get("pix_fmt")
+            rotation = _stream_rotation(stream)
+            try:
+                width = int(stream.get("width"))
+                height = int(stream.get("height"))
+            except (TypeError, ValueError):
+                continue
+            if width > 0 and height > 0:
+                if rotation % 180:
+                    width, height = height, width
+                dimensions = width, height
+
+    if dimensions is None:
+        # Fall back to pymediainfo if ffprobe is unavailable or returned invalid data.
+        dimensions = _mediainfo_dimensions(input_path)
+    return VideoInfo(
+        duration=duration,
+        dimensions=dimensions,
+        video_codec=video_codec,
+        pix_fmt=pix_fmt,
+        audio_codecs=tuple(audio_codecs),
+        rotated=bool(rotation % 360),
+    )
+
+
+# Probe results by source path, reused while the file's mtime and size are unchanged,
+# so a restarted converter does not re-probe the videos still in its queue.
+_PROBE_CACHE: Dict[str, Dict[str, object]] = {}
+_PROBE_CACHE_LOCK = Lock()
+
+
+def _load_probe_cache() -> None:
+    try:
+        data = json.loads(PROBE_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict):
+        with _PROBE_CACHE_LOCK:
+            _PROBE_CACHE.update(data)
+
+
+def _save_probe_cache() -> None:
+    """Persist entries whose source file is still waiting in the raw folder."""
+    with _PROBE_CACHE_LOCK:
+        entries = {path: entry for path, entry in _PROBE_CACHE.items() if os.path.exists(path)}
+        _PROBE_CACHE.clear()
+        _PROBE_CACHE.update(entries)
+    try:
+        if entries:
+            PROBE_CACHE_FILE.write_text(json.dumps(entries), encoding="utf-8")
+        else:
+            PROBE_CACHE_FILE.unlink(missing_ok=True)
+    except OSError as exc:
+        logger.warning("Unable to save probe cache: %s", exc)
+
+
+def _cached_probe_video_info(input_path: Path) -> VideoInfo:
+    try:
+        stat = input_path.stat()
+    except OSError:
+        return _probe_video_info(input_path)
+    key = str(input_path)
+    with _PROBE_CACHE_LOCK:
+        entry = _PROBE_CACHE.get(key)
+    if entry and entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("size") == stat.st_size:
+        info = entry["info"]
+        return VideoInfo(
+            duration=info["duration"],
+            dimensions=tuple(info["dimensions"]) if info["dimensions"] else None,
+            video_codec=info["video_codec"],
+            pix_fmt=info["pix_fmt"],
+            audio_codecs=tuple(info["audio_codecs"]),
+            rotated=info["rotated"],
+        )
+    info = _probe_video_info(input_path)
+    if info.duration is not None:
+        with _PROBE_CACHE_LOCK:
+            _PROBE_CACHE[key] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "info": asdict(info)}
+    return info
 
-    # Fall back to pymediainfo if ffprobe is unavailable or returned invalid data.
+
+def _can_stream_copy(input_path: Path, info: VideoInfo, scaled: Optional[tuple[int, int]]) -> bool:
+    """Whether the source already is browser-ready H.264/AAC and only needs remuxing."""
+    return (
+        scaled is None
+        and input_path.suffix.lower() in STREAM_COPY_SUFFIXES
+        and info.video_codec == "h264"
+        and info.pix_fmt == "yuv420p"
+        and all(codec == "aac" for codec in info.audio_codecs)
+        # Stripping metadata would also drop the rotation tag on older ffmpeg.
+        and not info.rotated
+    )
+
+
+def _mediainfo_dimensions(input_path: Path) -> Optional[tuple[int, int]]:
     try:
         media_info = MediaInfo.parse(input_path)
     except Exception as exc:  # pragma: no cover - optional dependency failures
@@ -299,17 +533,36 @@ def _scaled_dimensions(width: int, height: int) -> Optional[tuple[int, int]]:
     return new_width, new_height
 
 
+def _image_pool_context():
+    # The converter usually runs as a thread of the web server; forking that
+    # multithreaded process could copy locks held by other threads into workers.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
 class Converter:
-    def __init__(self, server_port: str):
+    def __init__(self, server_port: str, on_finished: Optional[Callable[[], None]] = None):
         self.server_port = server_port
+        self._on_finished = on_finished
         self.queue = ConversionQueue()
         self.processed = 0
-        self.errors: List[Dict[str, str]] = []
+        self.errors: Deque[Dict[str, str]] = deque(maxlen=10)
+        self._errors_snapshot: List[Dict[str, str]] = []
+        self._errors_seen = 0
         self.current: Optional[QueueItem] = None
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
+        self._scan_executor: Optional[ThreadPoolExecutor] = None
+        self._image_executor: Optional[ProcessPoolExecutor] = None
+        self._image_stop = None
         self._last_state_payload: Optional[Dict[str, object]] = None
+        self._last_quick_key: Optional[tuple] = None
+        self._last_publish_ts = 0.0
         self._ffmpeg_threads = CONVERTER_FFMPEG_THREADS
         if self._ffmpeg_threads:
             logger.info("Limiting ffmpeg to %s thread(s)", self._ffmpeg_threads)
+        self._hw_encoder = _select_hw_encoder(CONVERTER_HWACCEL)
+        if self._hw_encoder is not None:
+            logger.info("Encoding videos with %s", self._hw_encoder.codec)
         if SYNCTHING_AUTO_PAUSE and SYNCTHING_FOLDER_ID:
             self._syncthing_manager = SyncthingPauseManager(
                 SYNCTHING_API_URL,
@@ -331,6 +584,7 @@ class Converter:
                 process.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 process.kill()
+                process.wait()
         raise StopRequested
 
     def _state_payload(self, status: str, current: Optional[Dict[str, object]]) -> Dict[str, object]:
@@ -351,13 +605,15 @@ class Converter:
             "remaining": pending,
             "percent": percent,
             "current": current,
-            "errors": [dict(error) for error in self.errors],
+            "errors": self._errors_snapshot,
         }
 
     def _publish_state(self, payload: Dict[str, object], *, force: bool = False) -> None:
         if not force and self._last_state_payload == payload:
             return
-        self._last_state_payload = deepcopy(payload)
+        # _state_payload builds a fresh dict (and error copies) on every call and nothing
+        # mutates it afterwards, so keeping the reference is enough.
+        self._last_state_payload = payload
         update_state(payload)
 
     def _set_state(
@@ -367,16 +623,38 @@ class Converter:
         *,
         force: bool = False,
     ) -> None:
+        # Cheap check first: progress within the same 1% bucket is published at most
+        # every STATE_PUBLISH_INTERVAL without building or comparing the payload.
+        percent = current.get("percent") if current else None
+        quick_key = (
+            status,
+            current.get("file") if current else None,
+            int(percent) if isinstance(percent, (int, float)) else None,
+            len(self.queue),
+            self.processed,
+            self._errors_seen,
+        )
+        now = time.monotonic()
+        if (
+            not force
+            and quick_key == self._last_quick_key
+            and now - self._last_publish_ts < STATE_PUBLISH_INTERVAL
+        ):
+            return
+        self._last_quick_key = quick_key
+        self._last_publish_ts = now
         self._publish_state(self._state_payload(status, current), force=force)
 
     def _remember_error(self, item: QueueItem, message: str) -> None:
         entry = {
             "file": item.relative_path,
             "message": message,
-            "timestamp": _now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": local_now().strftime("%Y-%m-%d %H:%M:%S"),
         }
         self.errors.append(entry)
-        self.errors[:] = self.errors[-10:]
+        self._errors_seen += 1
+        # Entries are never mutated, so payloads can share one list until the next error.
+        self._errors_snapshot = list(self.errors)
 
     def _current_payload(
         self,
@@ -405,50 +683,230 @@ class Converter:
 
     def _convert_image(self, item: QueueItem) -> None:
         path = item.absolute_path
-        if not path.exists():
-            return
         self._ensure_stop()
-        with Image.open(path) as img:
-            capture = get_capture_date(img) or _parse_datetime_from_name(path.name) or _now()
-            oriented = ImageOps.exif_transpose(img)
-            width, height = oriented.size
-            ratio = min(1.0, IMAGE_MAX_WIDTH / max(width, 1), IMAGE_MAX_HEIGHT / max(height, 1))
-            if oriented.mode not in ("RGB", "L"):
-                working = oriented.convert("RGB")
-            else:
-                working = oriented.copy()
-            if ratio < 1.0:
-                new_size = (int(width * ratio), int(height * ratio))
-                working = working.resize(new_size, Image.LANCZOS)
-            output_name = get_new_filename(path.name, capture, ext=".jpg")
-            output_path = UPLOADED_DIR / output_name
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            self._ensure_stop()
-            working.save(output_path, "JPEG", quality=IMAGE_QUALITY, optimize=True)
+        output_name = convert_image_file(path, UPLOADED_DIR)
         self._ensure_stop()
         _remove_error_log(path)
         path.unlink(missing_ok=True)
         logger.info("Converted image %s -> %s", item.relative_path, output_name)
 
+    def _convert_image_batch(self, first: QueueItem) -> None:
+        """Convert ``first`` and the other queued images in the worker pool.
+
+        The pool is kept full: whenever a worker finishes, the next queued image is
+        submitted, so no core idles waiting for the slowest image of a fixed batch.
+        """
+        futures: Dict[Future, QueueItem] = {}
+        not_done = set()
+
+        def submit(items: List[QueueItem]) -> None:
+            for item in items:
+                if not item.absolute_path.exists():
+                    logger.warning("File %s missing, skipping", item.relative_path)
+                    continue
+                logger.info("Processing %s", item.relative_path)
+                future = self._image_executor.submit(convert_image_file, item.absolute_path, UPLOADED_DIR)
+                futures[future] = item
+                not_done.add(future)
+
+        submit([first] + self.queue.pop_batch("image", IMAGE_WORKERS - 1))
+        if not futures:
+            return
+        self._set_state("running", self._current_payload(first, percent=0.0), force=True)
+        stopped = False
+        while not_done:
+            # Wake up periodically so a stop request reaches the workers mid-batch.
+            done, _ = wait(not_done, timeout=PROGRESS_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            not_done.difference_update(done)
+            for future in done:
+                item = futures[future]
+                try:
+                    output_name = future.result()
+                except (CancelledError, StopRequested):
+                    continue
+                except Exception as exc:
+                    logger.error("Error processing %s: %s", item.relative_path, exc)
+                    _write_error_log(item.absolute_path, str(exc))
+                    self._remember_error(item, str(exc))
+                    self._set_state("running", None, force=True)
+                else:
+                    _remove_error_log(item.absolute_path)
+                    item.absolute_path.unlink(missing_ok=True)
+                    self.processed += 1
+                    logger.info("Converted image %s -> %s", item.relative_path, output_name)
+                    self._set_state("running", None)
+            if STOP_EVENT.is_set():
+                if not stopped:
+                    stopped = True
+                    self._image_stop.set()
+                    for pending in not_done:
+                        pending.cancel()
+            elif done:
+                submit(self.queue.pop_batch("image", IMAGE_WORKERS - len(not_done)))
+        if stopped:
+            for future, item in reversed(futures.items()):
+                if future.cancelled() or isinstance(future.exception(), StopRequested):
+                    self.queue.push_front(item)
+            raise StopRequested
+
+    def _video_command(
+        self,
+        input_path: Path,
+        output_path: Path,
+        preset: str,
+        scaled: Optional[tuple[int, int]],
+        encoder: Optional[HardwareEncoder],
+        *,
+        copy: bool = False,
+        hw_decode: bool = False,
+    ) -> List[str]:
+        cmd = ["ffmpeg"]
+        if self._ffmpeg_threads:
+            cmd.extend(["-threads", str(self._ffmpeg_threads)])
+        if encoder is not None:
+            cmd.extend(encoder.input_args)
+        elif hw_decode and not copy:
+            cmd.extend(HW_DECODE_ARGS)
+        cmd.extend(["-y", "-i", str(input_path)])
+        if copy:
+            cmd.extend(STREAM_COPY_ARGS)
+        elif encoder is not None:
+            cmd.extend(encoder.output_args)
+        else:
+            cmd.extend(["-c:v", "libx264", "-preset", preset, "-crf", "30", "-pix_fmt", "yuv420p"])
+        if not copy:
+            cmd.extend(AAC_AUDIO_ARGS)
+        cmd.extend(VIDEO_OUTPUT_ARGS)
+        if scaled is not None:
+            target_width, target_height = scaled
+            template = encoder.scale_filter if encoder is not None else "scale={width}:{height}"
+            cmd.extend(["-vf", template.format(width=target_width, height=target_height)])
+        elif encoder is not None and encoder.base_filter:
+            cmd.extend(["-vf", encoder.base_filter])
+        # The output goes to a .part file, so the container cannot be guessed from the name.
+        cmd.extend(["-f", "mp4", str(output_path)])
+        return cmd
+
+    def _run_ffmpeg(
+        self,
+        item: QueueItem,
+        cmd: List[str],
+        output_path: Path,
+        duration: Optional[float],
+    ) -> tuple[int, str]:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        # stderr is drained concurrently so a chatty ffmpeg can never block on a full pipe.
+        stderr_chunks: List[bytes] = []
+        stderr_reader = Thread(target=_drain_pipe, args=(process.stderr, stderr_chunks), daemon=True)
+        stderr_reader.start()
+        # stdout is read on a thread too: select() only accepts sockets on Windows.
+        stdout_chunks: "SimpleQueue[bytes]" = SimpleQueue()
+        stdout_reader = Thread(target=_pump_pipe, args=(process.stdout, stdout_chunks), daemon=True)
+        stdout_reader.start()
+        published_percent = -PROGRESS_STEP_PERCENT
+        try:
+            pending = b""
+            while True:
+                self._check_stop(process)
+                # Waiting with a timeout lets a stop request land even while ffmpeg is silent.
+                try:
+                    chunk = stdout_chunks.get(timeout=PROGRESS_POLL_SECONDS)
+                except Empty:
+                    continue
+                if not chunk:
+                    break
+                pending += chunk
+                end = pending.rfind(b"\n")
+                if end < 0:
+                    continue
+                block, pending = pending[:end], pending[end + 1 :]
+                if duration is None or duration <= 0:
+                    continue
+                out_time = _last_out_time(block)
+                if out_time is None:
+                    continue
+                current_seconds = out_time / 1_000_000
+                last_percent = max(0.0, min((current_seconds / duration) * 100.0, 100.0))
+                if last_percent - published_percent < PROGRESS_STEP_PERCENT:
+                    continue
+                published_percent = last_percent
+                eta = max(duration - current_seconds, 0.0)
+                progress = self._current_payload(item, percent=last_percent, eta=eta, duration=duration)
+                self._set_state("running", progress)
+        except StopRequested:
+            output_path.unlink(missing_ok=True)
+            raise
+        except BaseException:
+            # Nobody is watching the progress any more; do not leave ffmpeg running.
+            process.kill()
+            process.wait()
+            raise
+        return_code = process.wait()
+        stdout_reader.join()
+        stderr_reader.join()
+        stderr = b"".join(stderr_chunks).decode("utf-8", "replace")
+        try:
+            self._check_stop()
+        except StopRequested:
+            output_path.unlink(missing_ok=True)
+            raise
+        return return_code, stderr
+
+    def _finish_item(self, scan: "Future[List[str]]") -> None:
+        self._set_state("running", None)
+        try:
+            scanned = scan.result()
+        except Exception as exc:  # pragma: no cover - filesystem failures
+            logger.warning("Background queue scan failed: %s", exc)
+            scanned = None
+        self.queue.refresh_from_disk(scanned)
+        self._prefetch_probes()
+
+    def _prefetch_probes(self) -> None:
+        """Start ffprobe for queued videos so results are ready when encoding starts."""
+        if self._probe_executor is None:
+            return
+        for queued in self.queue.items:
+            if queued.file_type == "video" and queued.probe_future is None:
+                queued.probe_future = self._probe_executor.submit(_cached_probe_video_info, queued.absolute_path)
+
+    def _cancel_probes(self) -> None:
+        for queued in self.queue.items:
+            if queued.probe_future is not None:
+                queued.probe_future.cancel()
+                queued.probe_future = None
+
+    @staticmethod
+    def _probe_result(item: QueueItem) -> VideoInfo:
+        future, item.probe_future = item.probe_future, None
+        if future is not None and not future.cancelled():
+            try:
+                return future.result(timeout=PROBE_TIMEOUT_SECONDS)
+            except Exception as exc:
+                logger.warning("Prefetched probe failed for %s: %s", item.relative_path, exc)
+        return _cached_probe_video_info(item.absolute_path)
+
     def _convert_video(self, item: QueueItem) -> None:
         path = item.absolute_path
-        if not path.exists():
-            return
         capture = get_video_capture_date(path)
         output_name = get_new_filename(path.name, capture, ext=".mp4")
         output_path = UPLOADED_DIR / output_name
-        duration = _probe_video_duration(path)
+        info = self._probe_result(item)
+        duration, dimensions = info.duration, info.dimensions
         if duration is not None and duration <= 0:
             duration = None
-        dimensions = _probe_video_dimensions(path)
-        scale_args: List[str] = []
+        scaled: Optional[tuple[int, int]] = None
         preset = CONVERTER_VIDEO_PRESET
         if dimensions is not None:
             width, height = dimensions
             scaled = _scaled_dimensions(width, height)
             if scaled is not None:
                 target_width, target_height = scaled
-                scale_args = ["-vf", f"scale={target_width}:{target_height}"]
                 if CONVERTER_HIGH_RES_PRESET:
                     preset = CONVERTER_HIGH_RES_PRESET
                 triggers = []
@@ -474,85 +932,40 @@ class Converter:
                 )
         current = self._current_payload(item, percent=0.0, eta=duration, duration=duration)
         self._set_state("running", current, force=True)
-        cmd = ["ffmpeg"]
-        if self._ffmpeg_threads:
-            cmd.extend(["-threads", str(self._ffmpeg_threads)])
-        cmd.extend(
-            [
-                "-y",
-                "-i",
-                str(path),
-                "-c:v",
-                "libx264",
-                "-preset",
-                preset,
-                "-crf",
-                "30",
-                "-pix_fmt",
-                "yuv420p",
-                "-movflags",
-                "faststart",
-                "-c:a",
-                "aac",
-                "-b:a",
-                "128k",
-                "-map_metadata",
-                "-1",
-                "-progress",
-                "pipe:1",
-                "-nostats",
-                "-loglevel",
-                "error",
-                *scale_args,
-                str(output_path),
-            ]
-        )
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            encoding="utf-8",
-            bufsize=1,
-        )
-        last_percent = 0.0
-        try:
-            for line in iter(process.stdout.readline, ""):
-                self._check_stop(process)
-                line = line.strip()
-                if not line.startswith("out_time_ms=") or duration is None:
-                    continue
-                try:
-                    current_seconds = int(line.split("=", 1)[1]) / 1_000_000
-                except ValueError:
-                    continue
-                if duration <= 0:
-                    continue
-                last_percent = max(0.0, min((current_seconds / duration) * 100.0, 100.0))
-                eta = max(duration - current_seconds, 0.0)
-                progress = self._current_payload(item, percent=last_percent, eta=eta, duration=duration)
-                self._set_state("running", progress)
-        except StopRequested:
-            if output_path.exists():
-                output_path.unlink(missing_ok=True)
-            raise
-        finally:
-            if process.stdout:
-                process.stdout.close()
-        stderr = process.stderr.read() if process.stderr else ""
-        if process.stderr:
-            process.stderr.close()
-        return_code = process.wait()
-        try:
-            self._check_stop()
-        except StopRequested:
-            if output_path.exists():
-                output_path.unlink(missing_ok=True)
-            raise
+        encoder = self._hw_encoder
+        part_path = part_file_path(output_path)
+        return_code = -1
+        stderr = ""
+        if _can_stream_copy(path, info, scaled):
+            logger.info("Remuxing %s without re-encoding", item.relative_path)
+            cmd = self._video_command(path, part_path, preset, None, None, copy=True)
+            return_code, stderr = self._run_ffmpeg(item, cmd, part_path, duration)
+            if return_code != 0:
+                logger.warning("Remux failed for %s, re-encoding: %s", item.relative_path, stderr.strip())
+                part_path.unlink(missing_ok=True)
+                self._set_state("running", current, force=True)
+        # libx264 only decodes in hardware when hardware acceleration was asked for.
+        hw_decode = encoder is None and bool(CONVERTER_HWACCEL)
+        if return_code != 0:
+            cmd = self._video_command(path, part_path, preset, scaled, encoder, hw_decode=hw_decode)
+            return_code, stderr = self._run_ffmpeg(item, cmd, part_path, duration)
+        if return_code != 0 and (encoder is not None or hw_decode):
+            if encoder is None:
+                logger.warning("Hardware-decoded encode failed for %s, retrying in software", item.relative_path)
+            elif any(marker in stderr for marker in HW_DEVICE_ERRORS):
+                logger.warning("%s unavailable, using libx264 from now on: %s", encoder.codec, stderr.strip())
+                self._hw_encoder = None
+            else:
+                logger.warning("%s encode failed for %s, retrying with libx264", encoder.codec, item.relative_path)
+            part_path.unlink(missing_ok=True)
+            self._set_state("running", current, force=True)
+            # Plain software pipeline, in case the hardware path itself was the problem.
+            cmd = self._video_command(path, part_path, preset, scaled, None)
+            return_code, stderr = self._run_ffmpeg(item, cmd, part_path, duration)
         if return_code != 0:
-            if output_path.exists():
-                output_path.unlink(missing_ok=True)
+            part_path.unlink(missing_ok=True)
             raise RuntimeError(f"ffmpeg exited with code {return_code}: {stderr}")
+        os.replace(part_path, output_path)
         final_payload = self._current_payload(item, percent=100.0, eta=0.0, duration=duration)
         self._set_state("running", final_payload, force=True)
         _remove_error_log(path)
@@ -560,6 +973,7 @@ class Converter:
         logger.info("Converted video %s -> %s", item.relative_path, output_name)
 
     def _process_item(self, item: QueueItem) -> None:
+        # The only existence check per item; the converters below rely on it.
         if not item.absolute_path.exists():
             logger.warning("File %s missing, skipping", item.relative_path)
             return
@@ -576,11 +990,19 @@ class Converter:
             self.current = None
 
     def _notify_server(self) -> None:
+        if self._on_finished is not None:
+            # Running inside the server: refresh the library directly, no HTTP round trip.
+            try:
+                self._on_finished()
+            except Exception as exc:
+                logger.warning("Unable to refresh media library: %s", exc)
+            return
         if not self.server_port:
             return
         try:
             url = f"http://localhost:{self.server_port}/admin/update_content"
-            httpx.post(url, follow_redirects=True, timeout=5.0)
+            # Only the POST matters; following the redirect would render the admin page.
+            httpx.post(url, timeout=5.0)
         except Exception as exc:
             logger.warning("Unable to notify server: %s", exc)
 
@@ -598,15 +1020,41 @@ class Converter:
                 return
             STOP_EVENT.clear()
             self._set_state("running", None, force=True)
+            _load_probe_cache()
+            self._probe_executor = ThreadPoolExecutor(
+                max_workers=PROBE_WORKERS, thread_name_prefix="ffprobe"
+            )
+            self._prefetch_probes()
+            self._scan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="queue-scan")
+            if IMAGE_WORKERS > 1:
+                mp_context = _image_pool_context()
+                self._image_stop = mp_context.Event()
+                self._image_executor = ProcessPoolExecutor(
+                    max_workers=IMAGE_WORKERS,
+                    mp_context=mp_context,
+                    initializer=init_image_worker,
+                    initargs=(self._image_stop,),
+                )
             try:
                 while not STOP_EVENT.is_set():
                     if not len(self.queue):
+                        # The background scan started before the last item; look once more
+                        # for files uploaded while it converted.
                         if not self.queue.refresh_from_disk():
                             break
+                        self._prefetch_probes()
                         continue
                     item = self.queue.pop_next()
                     if item is None:
                         continue
+                    # Walk the upload folder while the item converts, not after it.
+                    scan = self._scan_executor.submit(ConversionQueue.scan)
+                    if item.file_type == "image" and self._image_executor is not None:
+                        try:
+                            self._convert_image_batch(item)
+                        finally:
+                            self._finish_item(scan)
+                        continue
                     try:
                         self._process_item(item)
                     except StopRequested:
@@ -620,15 +1068,23 @@ class Converter:
                     else:
                         self.processed += 1
                     finally:
-                        self._set_state("running", None)
-                        self.queue.refresh_from_disk()
+                        self._finish_item(scan)
             except StopRequested:
                 logger.info("Stop requested. Leaving remaining files in the queue.")
                 if self.current is not None:
                     self.queue.push_front(self.current)
+                self.queue.refresh_from_disk()
                 self._set_state("restarting", None, force=True)
             finally:
-                self.queue.refresh_from_disk()
+                self._cancel_probes()
+                self._probe_executor.shutdown(wait=False, cancel_futures=True)
+                self._probe_executor = None
+                _save_probe_cache()
+                self._scan_executor.shutdown(wait=True)
+                self._scan_executor = None
+                if self._image_executor is not None:
+                    self._image_executor.shutdown(wait=True, cancel_futures=True)
+                    self._image_executor = None
                 self._set_state("idle", None, force=True)
                 logger.info("Conversion finished. Processed %s files", self.processed)
                 self._notify_server()
@@ -639,7 +1095,7 @@ def main() -> None:
     if CONVERT_LOCK_FILE.exists():
         logger.info("Converter already running.")
         return
-    payload = {"pid": os.getpid(), "started": _now().isoformat()}
+    payload = {"pid": os.getpid(), "started": local_now().isoformat()}
     try:
         with CONVERT_LOCK_FILE.open("x", encoding="utf-8") as handle:
             json.dump(payload, handle)
@@ -13,6 +13,7 @@ from typing import Optional, TYPE_CHECKING
 from src.settings import (
     CONVERT_LOCK_FILE,
     CONVERTER_THROTTLE_SECONDS,
+    device_queue_manager,
 )
 from src.utils.conversion_state import get_state, update_state
 from src.utils.converter_queue import ConversionQueue
@@ -132,6 +133,11 @@ def is_conversion_running() -> bool:
     return _active_pid() is not None
 
 
+def _refresh_media() -> None:
+    # Same work as POST /admin/update_content, done in-process by the converter thread.
+    device_queue_manager.refresh_media()
+
+
 def start_conversion(port: Optional[str] = None) -> str:
     with _PROCESS_LOCK:
         if _thread_is_running():
@@ -155,7 +161,7 @@ def start_conversion(port: Optional[str] = None) -> str:
             return "Nothing to convert"
 
         converter_module = _load_converter_module()
-        converter: ConverterType = converter_module.Converter(port or "8000")
+        converter: ConverterType = converter_module.Converter(port or "8000", on_finished=_refresh_media)
 
         def _run_converter() -> None:
             try:
@@ -254,11 +260,13 @@ def get_conversion_status() -> dict:
     if normalized_last:
         state["last_update"] = normalized_last
 
-    errors = state.get("errors") or []
-    for error in errors:
+    errors = []
+    for error in state.get("errors") or ():
         if isinstance(error, dict):
-            ts = error.get("timestamp")
-            normalized = _normalize(ts)
+            normalized = _normalize(error.get("timestamp"))
             if normalized:
-                error["timestamp"] = normalized
+                # Shared with the state store, so never modify it in place.
+                error = {**error, "timestamp": normalized}
+        errors.append(error)
+    state["errors"] = errors
     return state
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from src.utils.converter_names import get_new_filename, local_now, parse_datetime_from_name, part_file_path
+from src.utils.converter_types import StopRequested
+from src.utils.files import get_capture_date
+
+# Image conversion as run inside the converter's worker processes. Those processes
+# import this module on their own, so it must not import src.settings: that would
+# create the storage folders and load the device registry in every worker.
+
+IMAGE_MAX_WIDTH = 3840
+IMAGE_MAX_HEIGHT = 2160
+IMAGE_QUALITY = 60
+IMAGE_OPTIMIZE_MAX_PIXELS = 2_000_000
+EXIF_ORIENTATION_TAG = 0x0112
+# Formats whose EXIF block is parsed from the header when the file is opened.
+EXIF_FORMATS = frozenset({"JPEG", "MPO", "HEIF", "HEIC", "TIFF", "WEBP"})
+
+HEIF_SUFFIXES = frozenset({".heic", ".heif"})
+_HEIF_REGISTERED = False
+
+
+def _ensure_heif_opener() -> None:
+    """Import pillow_heif only once a HEIF file actually shows up."""
+    global _HEIF_REGISTERED
+    if _HEIF_REGISTERED:
+        return
+    _HEIF_REGISTERED = True
+    try:  # pragma: no cover - optional dependency
+        from pillow_heif import register_heif_opener
+
+        register_heif_opener()
+    except Exception:  # pragma: no cover - optional dependency
+        pass
+
+
+def _draft_jpeg(img: Image.Image, exif: Image.Exif) -> None:
+    """Let libjpeg downscale by 1/2, 1/4 or 1/8 while decoding when the image is too large."""
+    width, height = img.size
+    if exif.get(EXIF_ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+        width, height = height, width
+    ratio = min(1.0, IMAGE_MAX_WIDTH / max(width, 1), IMAGE_MAX_HEIGHT / max(height, 1))
+    if ratio >= 1.0:
+        return
+    # Keep twice the target size so the final LANCZOS pass still has detail to work with.
+    scale = min(1.0, ratio * 2)
+    img.draft("RGB", (int(img.width * scale), int(img.height * scale)))
+
+
+_WORKER_STOP = None
+
+
+def init_image_worker(stop_event) -> None:
+    """Give an image worker process the converter's cross-process stop flag."""
+    global _WORKER_STOP
+    _WORKER_STOP = stop_event
+
+
+def _check_worker_stop() -> None:
+    if _WORKER_STOP is not None and _WORKER_STOP.is_set():
+        raise StopRequested
+
+
+def convert_image_file(path: Path, output_dir: Path) -> str:
+    """Convert a raw image to JPEG in ``output_dir`` and return the new name.
+
+    Runs in the image worker processes, so it must not touch converter state.
+    """
+    _check_worker_stop()
+    if path.suffix.lower() in HEIF_SUFFIXES:
+        _ensure_heif_opener()
+    with Image.open(path) as img:
+        # PNG and friends may decode the whole file just to look for EXIF; use the name instead.
+        exif = img.getexif() if img.format in EXIF_FORMATS else None
+        capture = get_capture_date(img, exif) if exif is not None else None
+        capture = capture or parse_datetime_from_name(path.name) or local_now()
+        if img.format == "JPEG":
+            _draft_jpeg(img, exif)
+        oriented = ImageOps.exif_transpose(img)
+        # exif_transpose already returns a new image, so it can be resized in place.
+        working = oriented if oriented.mode in ("RGB", "L") else oriented.convert("RGB")
+        # Box-reduce by an integer factor first, then LANCZOS on the smaller image.
+        working.thumbnail((IMAGE_MAX_WIDTH, IMAGE_MAX_HEIGHT), Image.LANCZOS, reducing_gap=3.0)
+        output_name = get_new_filename(path.name, capture, ext=".jpg")
+        output_path = output_dir / output_name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        _check_worker_stop()
+        part_path = part_file_path(output_path)
+        try:
+            # The extra Huffman pass of optimize=True is only cheap on small images.
+            working.save(
+                part_path,
+                "JPEG",
+                quality=IMAGE_QUALITY,
+                optimize=working.width * working.height < IMAGE_OPTIMIZE_MAX_PIXELS,
+                progressive=False,
+                subsampling="4:2:0",
+            )
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        os.replace(part_path, output_path)
+    return output_name
@@ -0,0 +1,81 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Output naming shared by the converter and its image worker processes; keep it free
+# of src.settings so the workers do not load the web app configuration.
+
+_DT_FULL_RE = re.compile(r"(\d{4})[-_]?(\d{2})[-_]?(\d{2})[-_ ]?(\d{2})[-_]?(\d{2})[-_]?(\d{2})")
+_DT_DATE_RE = re.compile(r"(\d{4})[-_]?(\d{2})[-_]?(\d{2})")
+_PAREN_RE = re.compile(r"\(\d+\)$")
+_DATE_PREFIX_RE = re.compile(r"^(\d{4}[-_]?\d{2}[-_]?\d{2}([-_ ]?\d{2}[-_]?\d{2}[-_]?\d{2})?)")
+# Whitespace and punctuation runs (dashes included) all collapse to a single dash.
+_NON_WORD_RUN_RE = re.compile(r"[^\w]+", re.UNICODE)
+_UNDERSCORE_RUN_RE = re.compile(r"_{2,}")
+
+
+def local_now() -> datetime:
+    return datetime.now().astimezone()
+
+
+def parse_datetime_from_name(name: str) -> Optional[datetime]:
+    base = Path(name).stem
+    match = _DT_FULL_RE.search(base)
+    if match:
+        parts = [int(value) for value in match.groups()]
+        try:
+            return datetime(*parts)
+        except ValueError:
+            return None
+    match = _DT_DATE_RE.search(base)
+    if match:
+        y, m, d = [int(value) for value in match.groups()]
+        try:
+            return datetime(y, m, d)
+        except ValueError:
+            return None
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _clean_base_name(original_name: str) -> str:
+    base = Path(original_name).stem
+    base = _PAREN_RE.sub("", base)
+    base = _DATE_PREFIX_RE.sub("", base)
+    base = base.strip()
+    base = _NON_WORD_RUN_RE.sub("-", base)
+    base = _UNDERSCORE_RUN_RE.sub("_", base)
+    return base.strip("-_")
+
+
+def _is_redundant_time_segment(base: str, time_part: str) -> bool:
+    if not base:
+        return False
+    if any(ch not in "0123456789-_" for ch in base):
+        return False
+    digits = "".join(ch for ch in base if ch.isdigit())
+    return digits == time_part and len(digits) == len(time_part)
+
+
+def get_new_filename(original_name: str, capture_date: Optional[datetime] = None, ext: Optional[str] = None) -> str:
+    capture = capture_date or parse_datetime_from_name(original_name) or local_now()
+    if capture.tzinfo:
+        capture = capture.astimezone().replace(tzinfo=None)
+    suffix = ext if ext is not None else Path(original_name).suffix
+    suffix = suffix.lower() if suffix else ""
+    if suffix and not suffix.startswith("."):
+        suffix = f".{suffix}"
+    base = _clean_base_name(original_name)
+    date_part, time_part = capture.strftime("%Y%m%d %H%M%S").split(" ")
+    if _is_redundant_time_segment(base, time_part):
+        base = ""
+    if base:
+        return f"{date_part}-{time_part}-{base}{suffix}"
+    return f"{date_part}-{time_part}{suffix}"
+
+
+def part_file_path(output_path: Path) -> Path:
+    """Temporary name the output is written under until it is complete."""
+    return output_path.with_name(output_path.name + ".part")
@@ -1,5 +1,7 @@
 import logging
-from dataclasses import dataclass
+import os
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional
 
@@ -11,10 +13,35 @@ VIDEO_SUFFIXES = {ext.lower() for ext in VIDEO_EXTENSIONS}
 logger = logging.getLogger("media converter")
 
 
+def _scan_raw_files(root: Path) -> List[str]:
+    """Return POSIX paths of files under ``root``, relative to it, skipping ``failed/``.
+
+    ``os.scandir`` reports entry types from the directory read itself, so no
+    per-file ``stat`` is needed.
+    """
+    found: List[str] = []
+    pending = [(str(root), "")]
+    while pending:
+        directory, prefix = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if prefix or entry.name != "failed":
+                            pending.append((entry.path, relative + "/"))
+                    elif entry.is_file():
+                        found.append(relative)
+        except OSError:
+            continue
+    return found
+
+
 @dataclass
 class QueueItem:
     relative_path: str
     file_type: str
+    probe_future: Optional[Future] = field(default=None, repr=False, compare=False)
 
     @property
     def absolute_path(self) -> Path:
@@ -36,24 +63,35 @@ class ConversionQueue:
                 existing.append(item)
         return existing
 
-    def refresh_from_disk(self) -> int:
-        """Reload queue items by scanning the raw upload directory."""
-        preserved = self._existing_items()
+    @staticmethod
+    def scan() -> List[str]:
+        """List raw upload files; safe to run on another thread."""
+        return _scan_raw_files(UPLOADED_RAW_DIR)
+
+    def refresh_from_disk(self, scanned: Optional[List[str]] = None) -> int:
+        """Reload queue items by scanning the raw upload directory.
+
+        :param scanned: result of an earlier :meth:`scan` to use instead of walking again.
+        """
+        # A scan taken earlier may list files that were converted (and removed) since.
+        verify = scanned is not None
+        if scanned is None:
+            scanned = self.scan()
+            # A fresh scan already tells which queued files still exist; no stat per item.
+            present = set(scanned)
+            preserved = [item for item in self.items if item.relative_path in present]
+        else:
+            preserved = self._existing_items()
         known_paths = {item.relative_path for item in preserved}
         new_items: List[QueueItem] = []
-        for file_path in sorted(UPLOADED_RAW_DIR.rglob("*")):
-            if not file_path.is_file():
-                continue
-            relative_path = file_path.relative_to(UPLOADED_RAW_DIR)
-            parts = relative_path.parts
-            if parts and parts[0] == "failed":
-                continue
-            suffix = file_path.suffix.lower()
+        for relative in scanned:
+            suffix = os.path.splitext(relative)[1].lower()
             if suffix == ".txt" or suffix not in ALL_EXTENSIONS:
                 continue
-            relative = relative_path.as_posix()
             if relative in known_paths:
                 continue
+            if verify and not (UPLOADED_RAW_DIR / relative).exists():
+                continue
             file_type = "video" if suffix in VIDEO_SUFFIXES else "image"
             new_items.append(QueueItem(relative_path=relative, file_type=file_type))
         new_items.sort(key=lambda item: item.relative_path)
@@ -67,6 +105,18 @@ class ConversionQueue:
             return None
         return self.items.pop(0)
 
+    def pop_batch(self, file_type: str, limit: int) -> List[QueueItem]:
+        """Remove up to ``limit`` items of ``file_type``, keeping queue order."""
+        batch: List[QueueItem] = []
+        remaining: List[QueueItem] = []
+        for item in self.items:
+            if len(batch) < limit and item.file_type == file_type:
+                batch.append(item)
+            else:
+                remaining.append(item)
+        self.items = remaining
+        return batch
+
     def push_back(self, item: QueueItem) -> None:
         if item.absolute_path.exists():
             self.items.append(item)
@@ -2,3 +2,7 @@ IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.heic', '.png', '.bmp', '.tiff', '.tif', '
 VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv']
 
 ALL_EXTENSIONS = {ext.lower() for ext in IMAGE_EXTENSIONS + VIDEO_EXTENSIONS}
+
+
+class StopRequested(Exception):
+    """Raised when the worker should abort and exit."""
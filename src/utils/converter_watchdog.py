@@ -12,7 +12,6 @@ from src.settings import (
     UPLOADED_RAW_DIR,
 )
 from src.utils.converter_control import enqueue_new_files, is_conversion_running, start_conversion
-from src.utils.converter_queue import ConversionQueue
 from src.utils.converter_types import ALL_EXTENSIONS
 
 logger = logging.getLogger("media converter")
@@ -43,16 +42,15 @@ class _ConversionHandler(FileSystemEventHandler):
     def _trigger(self) -> None:
         schedule_follow_up = False
         try:
-            added = enqueue_new_files()
+            # enqueue_new_files already scanned the upload tree and counted what is pending.
+            pending_total = enqueue_new_files()
             running = is_conversion_running()
             if running:
-                if added:
-                    logger.info("Queued %s new files while converter is running", added)
+                if pending_total:
+                    logger.info("Queued %s new files while converter is running", pending_total)
                 schedule_follow_up = True
                 return
 
-            queue = ConversionQueue()
-            pending_total = len(queue.items)
             if pending_total:
                 logger.info("Watchdog starting converter for %s pending files", pending_total)
                 start_conversion()
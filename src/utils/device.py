@@ -1,42 +1,60 @@
 import logging
 import re
 import uuid
+from functools import lru_cache
 
 from starlette.requests import Request
 
 from src.settings import device_queue_manager
 
+_IOS_VERSION_RE = re.compile(r'OS (\d+)_')
 
-def get_device_id(request: Request, cookie_device_id: str) -> str:
-    user_agent = request.headers.get("user-agent", "unknown")
-    client_ip = getattr(request.client, "host", "unknown")
-
-    if cookie_device_id:
-        device_queue_manager.update_device_info(
-            cookie_device_id,
-            user_agent=user_agent,
-            ip_address=client_ip,
-        )
-        logging.debug(
-            f"Existing device detected: {cookie_device_id}, UA: {user_agent}, IP: {client_ip}"
-        )
-        return cookie_device_id
-
-    new_device_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, user_agent + client_ip))
+
+@lru_cache(maxsize=4096)
+def _compute_device_id(user_agent: str, client_ip: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, user_agent + client_ip))
+
+
+def _is_known_device(device_id: str, user_agent: str, client_ip: str) -> bool:
+    info = device_queue_manager.devices_info.get(device_id)
+    return info is not None and info.user_agent == user_agent and info.ip_address == client_ip
+
+
+def _user_agent(request: Request) -> str:
+    # Scan the raw ASGI headers instead of building request.headers on every hit.
+    for name, value in request.scope["headers"]:
+        if name == b"user-agent":
+            return value.decode("latin-1")
+    return "unknown"
+
+
+def _client_ip(request: Request) -> str:
+    client = request.scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _register_device(device_id: str, user_agent: str, client_ip: str) -> None:
     device_queue_manager.update_device_info(
-        new_device_id,
-        user_agent=user_agent,
-        ip_address=client_ip,
-    )
-    logging.debug(
-        f"New device registered: {new_device_id}, UA: {user_agent}, IP: {client_ip}"
+        device_id,
+        {"user_agent": user_agent, "ip_address": client_ip},
     )
-    return new_device_id
+    logging.debug("Device registered: %s, UA: %s, IP: %s", device_id, user_agent, client_ip)
+
+
+def get_device_id(request: Request, cookie_device_id: str) -> str:
+    user_agent = _user_agent(request)
+    client_ip = _client_ip(request)
+    device_id = cookie_device_id or _compute_device_id(user_agent, client_ip)
+    # Steady state (known device, same UA/IP) is two dict lookups and no writes or logging.
+    if not _is_known_device(device_id, user_agent, client_ip):
+        _register_device(device_id, user_agent, client_ip)
+    return device_id
 
 
+@lru_cache(maxsize=1024)
 def is_outdated_ios(user_agent: str) -> bool:
     if "iPad" in user_agent or "iPhone" in user_agent:
-        match = re.search(r'OS (\d+)_', user_agent)
+        match = _IOS_VERSION_RE.search(user_agent)
         if match:
             ios_version = int(match.group(1))
             return ios_version < 10
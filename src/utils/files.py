@@ -5,30 +5,30 @@ import subprocess
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
-from src.settings import VIDEO_BACKGROUND_SUFFIX
-
 logger = logging.getLogger("media converter")
 
 if TYPE_CHECKING:  # pragma: no cover - typing helpers
     from PIL import Image
 
 
-def count_files_recursive(directory):
+def count_files_recursive(directory, skip_suffix: Optional[str] = None):
     return sum(
         1
         for root, dirs, files in os.walk(directory)
         for file in files
-        if not file.endswith(VIDEO_BACKGROUND_SUFFIX)
+        if not (skip_suffix and file.endswith(skip_suffix))
     )
 
 
-def get_capture_date(img: "Image.Image") -> Optional[datetime.datetime]:
+def get_capture_date(img: "Image.Image", exif: Optional["Image.Exif"] = None) -> Optional[datetime.datetime]:
     """
     Attempt to extract the capture date from the image's EXIF data.
+    Pass ``exif`` when the caller already parsed it to avoid reading it again.
     Returns a datetime object if available, otherwise None.
     """
     try:
-        exif = img.getexif()
+        if exif is None:
+            exif = img.getexif()
         if exif:
             # EXIF tag 36867 is DateTimeOriginal; fallback to tag 306 (DateTime)
             dt_str = exif.get(36867) or exif.get(306)
@@ -2,6 +2,20 @@ import base64
 import colorsys
 import random
 
+_LINEAR_PARAMS = 'x1="%d%%" y1="%d%%" x2="%d%%" y2="%d%%"'
+_RADIAL_PARAMS = 'cx="%d%%" cy="%d%%" r="%d%%"'
+_STOP = '<stop offset="%d%%" style="stop-color:%s;stop-opacity:1" />'
+_SVG = '''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400">
+      <defs>
+        <%sGradient id="grad" %s>
+          %s
+        </%sGradient>
+      </defs>
+      <rect width="400" height="400" fill="url(#grad)" />
+    </svg>'''
+GRADIENT_POOL_SIZE = 64
+_GRADIENT_POOL: tuple[str, ...] = ()
+
 
 def get_random_pastel_color():
     h = random.random()
@@ -11,42 +25,30 @@ def get_random_pastel_color():
     return '#{:02x}{:02x}{:02x}'.format(int(r * 255), int(g * 255), int(b * 255))
 
 
-def get_random_svg_gradient():
-    gradient_type = random.choice(["linear", "radial"])
-
-    if gradient_type == "linear":
-        x1 = f"{random.randint(0, 100)}%"
-        y1 = f"{random.randint(0, 100)}%"
-        x2 = f"{random.randint(0, 100)}%"
-        y2 = f"{random.randint(0, 100)}%"
-        gradient_params = f'x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"'
-    else:
-        cx = f"{random.randint(20, 80)}%"
-        cy = f"{random.randint(20, 80)}%"
-        r = f"{random.randint(30, 60)}%"
-        gradient_params = f'cx="{cx}" cy="{cy}" r="{r}"'
+def _build_svg_gradient():
+    randint = random.randint
 
-    num_stops = random.randint(2, 3)
+    if random.random() < 0.5:
+        gradient_type = "linear"
+        gradient_params = _LINEAR_PARAMS % (randint(0, 100), randint(0, 100), randint(0, 100), randint(0, 100))
+    else:
+        gradient_type = "radial"
+        gradient_params = _RADIAL_PARAMS % (randint(20, 80), randint(20, 80), randint(30, 60))
 
-    if num_stops == 2:
-        offsets = [0, 100]
+    if randint(2, 3) == 2:
+        offsets = (0, 100)
     else:
-        offsets = [0, random.randint(20, 80), 100]
-    offsets.sort()
+        offsets = (0, randint(20, 80), 100)
 
-    stops = []
-    for offset in offsets:
-        color = get_random_pastel_color()
-        stops.append(f'<stop offset="{offset}%" style="stop-color:{color};stop-opacity:1" />')
-    stops_svg = "\n          ".join(stops)
+    stops_svg = "\n          ".join(_STOP % (offset, get_random_pastel_color()) for offset in offsets)
+    svg = _SVG % (gradient_type, gradient_params, stops_svg, gradient_type)
+
+    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode('utf-8')).decode("ascii")
 
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="400" height="400">
-      <defs>
-        <{gradient_type}Gradient id="grad" {gradient_params}>
-          {stops_svg}
-        </{gradient_type}Gradient>
-      </defs>
-      <rect width="400" height="400" fill="url(#grad)" />
-    </svg>'''
 
-    return "data:image/svg+xml;base64," + base64.b64encode(svg.encode('utf-8')).decode("utf-8")
+def get_random_svg_gradient():
+    """Return a pastel gradient data URI picked from a pool generated on first use."""
+    global _GRADIENT_POOL
+    if not _GRADIENT_POOL:
+        _GRADIENT_POOL = tuple(_build_svg_gradient() for _ in range(GRADIENT_POOL_SIZE))
+    return random.choice(_GRADIENT_POOL)
@@ -1,6 +1,5 @@
 import logging
 from contextlib import contextmanager
-from copy import deepcopy
 from typing import Any, Dict, Optional
 
 import httpx
@@ -20,6 +19,7 @@ class SyncthingPauseManager:
         self.base_url = base_url.rstrip("/")
         self.folder_id = folder_id
         self.api_key = api_key
+        self._client: Optional[httpx.Client] = None
 
     def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {}
@@ -36,14 +36,15 @@ class SyncthingPauseManager:
         json_body: Optional[Dict[str, Any]] = None,
     ) -> Optional[httpx.Response]:
         url = f"{self.base_url}/{path.lstrip('/')}"
+        if self._client is None:
+            # One keep-alive connection serves the status/config/pause/resume calls of a run.
+            self._client = httpx.Client(headers=self._headers(), timeout=5.0)
         try:
-            response = httpx.request(
+            response = self._client.request(
                 method,
                 url,
                 params=params,
                 json=json_body,
-                headers=self._headers(),
-                timeout=5.0,
             )
             response.raise_for_status()
         except Exception as exc:  # pragma: no cover - network failures
@@ -84,8 +85,8 @@ class SyncthingPauseManager:
             return False
         if bool(config.get("paused")) == paused:
             return True
-        payload = deepcopy(config)
-        payload["paused"] = paused
+        # config is freshly parsed JSON and only a top-level key changes.
+        payload = {**config, "paused": paused}
         if self._put(f"rest/config/folders/{self.folder_id}", json_body=payload):
             logger.info(
                 "%s Syncthing folder %s",
@@ -95,6 +96,11 @@ class SyncthingPauseManager:
             return True
         return False
 
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
     def pause_folder(self) -> bool:
         return self._set_folder_paused(True)
 
@@ -115,3 +121,4 @@ class SyncthingPauseManager:
         finally:
             if should_resume and not was_paused:
                 self.resume_folder()
+            self.close()
@@ -1,28 +1,62 @@
 import logging
 import os
 import shutil
+import subprocess
+from threading import Lock, Thread
 from urllib.parse import quote
 
 from src.settings import MEDIA_DIR, VIDEO_BACKGROUND_SUFFIX, media_handler, MEDIA_PATH
 from src.utils.gradient import get_random_svg_gradient
 
+_PENDING_LOCK = Lock()
+_PENDING_BACKGROUNDS: set[str] = set()
+
+
+def _fallback_background() -> str:
+    media = media_handler.get_random_photo_background()
+    if media:
+        return f"{MEDIA_PATH}/{media}"
+    return get_random_svg_gradient()
+
+
+def _generate_background(input_path: str, background_file_path: str) -> None:
+    cmd = ["ffmpeg", "-y", "-i", input_path, "-ss", "00:00:01.000", "-vframes", "1", background_file_path]
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=60, check=True)
+        logging.info(f"Generated background frame: {background_file_path}")
+    except Exception as e:
+        logging.warning(f"Unable to generate background frame for {input_path}: {e}")
+    finally:
+        with _PENDING_LOCK:
+            _PENDING_BACKGROUNDS.discard(background_file_path)
+
+
+def _schedule_background(input_path: str, background_file_path: str) -> None:
+    with _PENDING_LOCK:
+        if background_file_path in _PENDING_BACKGROUNDS:
+            return
+        _PENDING_BACKGROUNDS.add(background_file_path)
+    Thread(target=_generate_background, args=(input_path, background_file_path), daemon=True).start()
+
 
 def get_static_background_path(file_path: str) -> str:
+    cached = media_handler.background_urls.get(file_path)
+    if cached is not None:
+        return cached
+
     input_path = os.path.join(MEDIA_DIR, file_path)
     base, _ = os.path.splitext(file_path)
     background_filename = f"{base}{VIDEO_BACKGROUND_SUFFIX}"
     background_file_path = os.path.join(MEDIA_DIR, background_filename)
 
-    if not os.path.exists(background_file_path):
+    if background_file_path in _PENDING_BACKGROUNDS or not os.path.exists(background_file_path):
         if shutil.which("ffmpeg"):
-            cmd = f'ffmpeg -y -i "{input_path}" -ss 00:00:01.000 -vframes 1 "{background_file_path}"'
-            os.system(cmd)
-            logging.info(f"Generated background frame: {background_file_path}")
+            # The frame is extracted in the background; this request gets a fallback.
+            _schedule_background(input_path, background_file_path)
         else:
             logging.warning("ffmpeg not available. Using fallback gradient background.")
-            media = media_handler.get_random_photo_background()
-            if media:
-                return f"{MEDIA_PATH}/{media}"
-            return get_random_svg_gradient()
+        return _fallback_background()
 
-    return f"{MEDIA_PATH}/{quote(background_filename)}"
+    background_url = f"{MEDIA_PATH}/{quote(background_filename)}"
+    media_handler.background_urls[file_path] = background_url
+    return background_url
@@ -5,13 +5,13 @@ from threading import Thread
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
-from src.settings import CONVERT_LOCK_FILE, media_handler, MEDIA_DIR, UPLOADED_RAW_DIR
+from src.settings import CONVERT_LOCK_FILE, device_queue_manager, MEDIA_DIR, UPLOADED_RAW_DIR
 
 logger = logging.getLogger("Watchdog")
 
 class MediaFolderHandler(FileSystemEventHandler):
-    def __init__(self, media_dict):
-        self.media_dict = media_dict
+    def __init__(self, queue_manager):
+        self.queue_manager = queue_manager
 
     def _should_ignore(self, event):
         event_path = Path(event.src_path).resolve()
@@ -23,16 +23,16 @@ class MediaFolderHandler(FileSystemEventHandler):
         if event.is_directory or self._should_ignore(event) or CONVERT_LOCK_FILE.exists():
             return
         logger.debug("Watchdog syncing after create: %s", event.src_path)
-        self.media_dict.sync_files()
+        self.queue_manager.refresh_media()
 
     def on_deleted(self, event):
         if event.is_directory or self._should_ignore(event) or CONVERT_LOCK_FILE.exists():
             return
         logger.debug("Watchdog syncing after delete: %s", event.src_path)
-        self.media_dict.sync_files()
+        self.queue_manager.refresh_media()
 
 
-event_handler = MediaFolderHandler(media_handler)
+event_handler = MediaFolderHandler(device_queue_manager)
 observer = Observer()
 observer.schedule(event_handler, str(MEDIA_DIR), recursive=True)
 